@@ -0,0 +1,83 @@
+import numpy as np
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models import DailySchedule
+
+MINUTES_PER_DAY = 24 * 60
+# Задачи не назначаются в последние 10 минут смены
+END_MARGIN_MINUTES = 10
+
+SCHEDULE_FIELDS = ('working_today', 'start_hour', 'end_hour', 'available')
+
+def schedule_signature(schedules):
+    """Неизменяемый снимок расписания для сравнения между циклами"""
+    return tuple(sorted(
+        (s.employee_email, s.working_today, s.start_hour, s.end_hour, s.available)
+        for s in schedules
+    ))
+
+class AvailabilityTimeline:
+    """Поминутная сетка доступности технологов на один день"""
+
+    def __init__(self, day, schedules):
+        self.day = day
+        # Сигнатура расписания: по ней понимаем, нужно ли пересобирать сетку
+        self.signature = schedule_signature(schedules)
+
+        active = [row for row in self.signature if row[1] and row[4]]
+        self.emails = np.array([row[0] for row in active], dtype=object)
+
+        self._cache = {}
+
+        # Матрица минут x технологов строится одной векторной операцией
+        if active:
+            minutes = np.arange(MINUTES_PER_DAY)[:, None]
+            starts = np.array([row[2] * 60 for row in active], dtype=np.int32)
+            ends = np.array([row[3] * 60 - END_MARGIN_MINUTES for row in active], dtype=np.int32)
+            self._matrix = (minutes >= starts) & (minutes < ends)
+        else:
+            # Сегодня никто не работает: пустая булева матрица, а не object-dtype
+            self._matrix = np.zeros((MINUTES_PER_DAY, 0), dtype=bool)
+
+    def working_at(self, moment):
+        """Email технологов, работающих в указанный момент (datetime или минута дня)"""
+        minute = moment if isinstance(moment, int) else moment.hour * 60 + moment.minute
+        if not 0 <= minute < MINUTES_PER_DAY:
+            return ()
+
+        working = self._cache.get(minute)
+        if working is None:
+            working = tuple(self.emails[self._matrix[minute]])
+            self._cache[minute] = working
+        return working
+
+    def matches(self, schedules):
+        """Совпадает ли сетка с текущим расписанием"""
+        return schedule_signature(schedules) == self.signature
+
+def dialect_insert(table):
+    """INSERT с поддержкой ON CONFLICT для текущей БД"""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert(table)
+    if dialect == 'sqlite':
+        return sqlite.insert(table)
+    raise RuntimeError(f'INSERT ... ON CONFLICT не поддерживается для {dialect}')
+
+def upsert_schedules(rows):
+    """Вставить или обновить строки DailySchedule одним запросом"""
+    # Дубликаты (email, дата) внутри одного INSERT ... ON CONFLICT недопустимы,
+    # поэтому последняя запись побеждает
+    unique_rows = {}
+    for row in rows:
+        unique_rows[(row['employee_email'], row['date'])] = row
+    if not unique_rows:
+        return 0
+
+    stmt = dialect_insert(DailySchedule.__table__).values(list(unique_rows.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['employee_email', 'date'],
+        set_={field: stmt.excluded[field] for field in SCHEDULE_FIELDS}
+    )
+    db.session.execute(stmt)
+    return len(unique_rows)
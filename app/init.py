@@ -9,6 +9,35 @@ load_dotenv()
 db = SQLAlchemy()
 login_manager = LoginManager()
 
+def get_engine_options(database_url):
+    """Настройки пула соединений и таймаутов из переменных окружения"""
+    options = {
+        # Проверка соединения перед выдачей из пула: после простоя
+        # бесплатный Postgres обрывает соединения
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true',
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 280)),
+    }
+    
+    # Лимит соединений на бесплатном тарифе небольшой, поэтому пул на процесс
+    # ограничен: pool_size + max_overflow на каждый воркер gunicorn и фоновый воркер.
+    # Для файловой SQLite те же лимиты, чтобы локальный нагрузочный тест их проверял;
+    # SQLite в памяти использует пул без этих параметров
+    if database_url not in ('sqlite://', 'sqlite:///:memory:'):
+        options.update({
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', 2)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 1)),
+            'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        })
+    
+    if database_url.startswith(('postgres://', 'postgresql')):
+        statement_timeout = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 15000))
+        options['connect_args'] = {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 10)),
+            'options': f'-c statement_timeout={statement_timeout}',
+        }
+    
+    return options
+
 def create_app():
     app = Flask(__name__)
     
@@ -16,6 +45,7 @@ def create_app():
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
     app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///local.db')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = get_engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
     app.config['TEMPLATES_AUTO_RELOAD'] = True
     
     # Инициализация расширений
@@ -25,9 +55,13 @@ def create_app():
     
     # Создание таблиц и начальных данных
     with app.app_context():
-        from app.models import Employee, ScriptStatus
+        from app.models import Employee, ScriptStatus, TaskHistory
         db.create_all()
         
+        # create_all не добавляет индексы к уже существующим таблицам
+        for index in TaskHistory.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
+        
         # Добавляем начальные данные если таблица пустая
         if Employee.query.count() == 0:
             initial_employees = [
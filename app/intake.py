@@ -0,0 +1,118 @@
+import hashlib
+import hmac
+import json
+import os
+from datetime import datetime, timedelta
+from app import db
+from app.models import TaskIntake, TaskArrival
+from app.availability import dialect_insert
+
+# Если задано, входящие webhook сохраняются в JSONL для локального воспроизведения
+RECORD_PATH = os.environ.get('WEBHOOK_RECORD_PATH')
+REDACTED_KEYS = ('access_token',)
+# Через сколько секунд повторять задачи, которые не удалось распределить
+RETRY_SECONDS = int(os.environ.get('INTAKE_RETRY_SECONDS', 60))
+
+def sign_payload(body, secret):
+    """Подпись тела запроса так же, как это делает Pyrus (X-Pyrus-Sig)"""
+    return hmac.new(secret.encode('utf-8'), body, hashlib.sha1).hexdigest()
+
+def verify_signature(body, signature, secret):
+    """Проверка подписи webhook"""
+    if not secret or not signature:
+        return False
+    return hmac.compare_digest(sign_payload(body, secret), signature.strip().lower())
+
+def extract_task_id(payload, form_id, step):
+    """ID задачи из уведомления, если она относится к нашей форме и этапу
+    
+    ValueError - если уведомление не похоже на уведомление Pyrus о задаче.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError('Уведомление должно быть JSON-объектом')
+    task = payload.get('task') or {}
+    if not isinstance(task, dict):
+        raise ValueError('Поле task должно быть объектом')
+
+    task_id = payload.get('task_id') or task.get('id')
+    if not task_id:
+        return None
+    if isinstance(task_id, bool) or not isinstance(task_id, (int, str)) or not str(task_id).isdigit():
+        raise ValueError(f'Некорректный task_id: {task_id!r}')
+
+    # Уведомления по другим формам и этапам не распределяем
+    if task.get('form_id') is not None and task.get('form_id') != form_id:
+        return None
+    if task.get('current_step') is not None and task.get('current_step') != step:
+        return None
+
+    return int(task_id)
+
+def record_payload(payload):
+    """Сохранить уведомление для последующего воспроизведения
+    
+    access_token бота в запись не попадает, поэтому исходная подпись к
+    записанному телу не подходит: replay_webhooks.py подписывает его заново.
+    """
+    if not RECORD_PATH:
+        return
+    if isinstance(payload, dict):
+        payload = {k: ('***' if k in REDACTED_KEYS else v) for k, v in payload.items()}
+    with open(RECORD_PATH, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({
+            'received_at': datetime.utcnow().isoformat(),
+            'body': json.dumps(payload, ensure_ascii=False)
+        }, ensure_ascii=False) + '\n')
+
+def enqueue(task_id, event=None):
+    """Поставить задачу в очередь приёма; повторные уведомления не дублируются"""
+    now = datetime.utcnow()
+    # Параллельные уведомления по одной задаче не должны падать на первичном ключе
+    db.session.execute(
+        dialect_insert(TaskIntake.__table__)
+        .values(task_id=task_id, event=event, received_at=now)
+        .on_conflict_do_nothing(index_elements=['task_id'])
+    )
+
+    # Время появления задачи для отчётов; уведомление приходит по задаче на нашем этапе
+    stmt = dialect_insert(TaskArrival.__table__).values(
+        task_id=task_id, first_seen_at=now, last_seen_at=now, in_register=True
+    )
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=['task_id'],
+        set_={'last_seen_at': stmt.excluded.last_seen_at, 'in_register': True}
+    ))
+
+    db.session.commit()
+
+def pending():
+    """Задачи из очереди, готовые к распределению
+    
+    Задачи остаются в очереди до подтверждения через acknowledge; неудачные
+    повторяются не чаще раза в RETRY_SECONDS. Задачи, которых по последней
+    сверке уже нет в реестре, из очереди удаляются.
+    """
+    gone = db.session.query(TaskArrival.task_id).filter(TaskArrival.in_register.is_(False))
+    TaskIntake.query.filter(TaskIntake.task_id.in_(gone)).delete(synchronize_session=False)
+
+    now = datetime.utcnow()
+    task_ids = [
+        row.task_id for row in
+        db.session.query(TaskIntake.task_id).filter(db.or_(
+            TaskIntake.attempted_at.is_(None),
+            TaskIntake.attempted_at < now - timedelta(seconds=RETRY_SECONDS)
+        )).order_by(TaskIntake.received_at)
+    ]
+    if task_ids:
+        TaskIntake.query.filter(TaskIntake.task_id.in_(task_ids)).update(
+            {'attempted_at': now}, synchronize_session=False
+        )
+    # Завершаем транзакцию и при пустой очереди, чтобы соединение не висело между опросами
+    db.session.commit()
+    return task_ids
+
+def acknowledge(task_ids):
+    """Удалить из очереди обработанные задачи"""
+    if task_ids:
+        TaskIntake.query.filter(TaskIntake.task_id.in_(task_ids)).delete(synchronize_session=False)
+        db.session.commit()
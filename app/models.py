@@ -56,11 +56,31 @@ class TaskHistory(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     task_id = db.Column(db.Integer, nullable=False)
     employee_email = db.Column(db.String(100), nullable=False)
-    assigned_at = db.Column(db.DateTime, default=datetime.utcnow)
+    assigned_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
     def __repr__(self):
         return f'<TaskHistory task={self.task_id} to {self.employee_email}>'
 
+class TaskArrival(db.Model):
+    task_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    first_seen_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    last_seen_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    # Есть ли задача в последнем снимке реестра и кто за неё сейчас отвечает
+    in_register = db.Column(db.Boolean, default=True, index=True)
+    responsible_email = db.Column(db.String(100))
+    
+    def __repr__(self):
+        return f'<TaskArrival task={self.task_id} at {self.first_seen_at}>'
+
+class TaskIntake(db.Model):
+    task_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    event = db.Column(db.String(50))
+    received_at = db.Column(db.DateTime, default=datetime.utcnow)
+    attempted_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<TaskIntake task={self.task_id} {self.event}>'
+
 class SystemLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     level = db.Column(db.String(20))
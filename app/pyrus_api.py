@@ -1,22 +1,32 @@
-import requests
 import logging
+import requests
 from datetime import datetime, timedelta
 import pytz
 from app import db
 from app.models import SystemLog
+from app.pyrus_traffic import get_transport
 
 logger = logging.getLogger(__name__)
 
+# Сетевые ошибки и неожиданный формат ответа Pyrus. ReplayMiss сюда намеренно
+# не входит: промах воспроизведения должен прерывать прогон, а не считаться ошибкой API
+REQUEST_ERRORS = (requests.RequestException, ValueError, KeyError, TypeError, AttributeError)
+
 class PyrusAPI:
-    def __init__(self):
+    def __init__(self, transport=None, dry_run=False):
         from config.pyrus_config import PYRUS_CONFIG
         self.config = PYRUS_CONFIG
+        # requests, запись или воспроизведение трафика (см. app.pyrus_traffic)
+        self.http = transport or get_transport()
+        # В режиме dry_run задачи не переназначаются и в БД ничего не пишется
+        self.dry_run = dry_run
         
     def _log(self, level, message):
         """Логирование в базу данных"""
-        log_entry = SystemLog(level=level, message=message)
-        db.session.add(log_entry)
-        db.session.commit()
+        if not self.dry_run:
+            log_entry = SystemLog(level=level, message=message)
+            db.session.add(log_entry)
+            db.session.commit()
         getattr(logger, level)(message)
     
     def update_access_token(self):
@@ -27,7 +37,7 @@ class PyrusAPI:
                 'security_key': self.config['SECURITY_KEY']
             }
             
-            response = requests.post(
+            response = self.http.post(
                 self.config['AUTH_URL'],
                 json=data,
                 timeout=30
@@ -41,17 +51,17 @@ class PyrusAPI:
             else:
                 self._log('error', f'Ошибка обновления токена: {response.status_code}')
                 return False
-        except Exception as e:
+        except REQUEST_ERRORS as e:
             self._log('error', f'Исключение при обновлении токена: {str(e)}')
             return False
     
     def fetch_tasks(self):
-        """Получение задач из Pyrus"""
-        url = 'https://api.pyrus.com/v4/forms/607869/register?steps=4'
+        """Получение задач из Pyrus; None при ошибке, чтобы отличать её от пустого реестра"""
+        url = f'https://api.pyrus.com/v4/forms/{self.config["FORM_ID"]}/register?steps={self.config["STEP"]}'
         headers = {'Authorization': f'Bearer {self.config["ACCESS_TOKEN"]}'}
         
         try:
-            response = requests.get(url, headers=headers, timeout=30)
+            response = self.http.get(url, headers=headers, timeout=30)
             
             if response.status_code == 200:
                 tasks = [task['id'] for task in response.json().get('tasks', [])]
@@ -62,13 +72,13 @@ class PyrusAPI:
                 if self.update_access_token():
                     return self.fetch_tasks()
                 else:
-                    return []
+                    return None
             else:
                 self._log('error', f'Ошибка получения задач: {response.status_code}')
-                return []
-        except Exception as e:
+                return None
+        except REQUEST_ERRORS as e:
             self._log('error', f'Исключение при получении задач: {str(e)}')
-            return []
+            return None
     
     def get_task_responsible(self, task_id):
         """Получить ответственного по задаче"""
@@ -76,7 +86,7 @@ class PyrusAPI:
         headers = {'Authorization': f'Bearer {self.config["ACCESS_TOKEN"]}'}
         
         try:
-            response = requests.get(url, headers=headers, timeout=30)
+            response = self.http.get(url, headers=headers, timeout=30)
             
             if response.status_code == 200:
                 task_data = response.json()
@@ -108,7 +118,7 @@ class PyrusAPI:
             else:
                 self._log('error', f'Ошибка получения задачи {task_id}: {response.status_code}')
                 return None
-        except Exception as e:
+        except REQUEST_ERRORS as e:
             self._log('error', f'Исключение при получении задачи {task_id}: {str(e)}')
             return None
     
@@ -127,8 +137,12 @@ class PyrusAPI:
             }]
         }
         
+        if self.dry_run:
+            self._log('info', f'[dry-run] Задача {task_id} была бы назначена на {new_responsible_email}')
+            return True
+        
         try:
-            response = requests.post(url, headers=headers, json=data, timeout=30)
+            response = self.http.post(url, headers=headers, json=data, timeout=30)
             
             if response.status_code == 200:
                 self._log('info', f'Задача {task_id} назначена на {new_responsible_email}')
@@ -136,6 +150,6 @@ class PyrusAPI:
             else:
                 self._log('error', f'Ошибка назначения задачи {task_id}: {response.status_code}')
                 return False
-        except Exception as e:
+        except REQUEST_ERRORS as e:
             self._log('error', f'Исключение при назначении задачи {task_id}: {str(e)}')
             return False
@@ -0,0 +1,134 @@
+import gzip
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Режим работы с Pyrus: live (по умолчанию), record или replay
+TRAFFIC_MODE = os.environ.get('PYRUS_TRAFFIC_MODE', 'live')
+TRAFFIC_FILE = os.environ.get('PYRUS_TRAFFIC_FILE', 'pyrus_traffic.jsonl.gz')
+# 1 - исходные задержки, 2 - вдвое быстрее, 0 - без задержек
+REPLAY_SPEED = float(os.environ.get('PYRUS_REPLAY_SPEED', 1))
+
+# Секреты не попадают в запись
+REDACTED_REQUEST_KEYS = ('login', 'security_key')
+REDACTED_RESPONSE_KEYS = ('access_token',)
+
+def _redact(data, keys):
+    if isinstance(data, dict):
+        return {k: ('***' if k in keys else v) for k, v in data.items()}
+    return data
+
+def _request_key(method, url, body):
+    """Ключ сопоставления запроса: метод, URL и тело (без секретов)"""
+    return f'{method} {url} {json.dumps(body, sort_keys=True, ensure_ascii=False)}'
+
+class ReplayMiss(LookupError):
+    """В записи нет ответа на запрос; результат воспроизведения был бы недостоверен"""
+
+class RecordedResponse:
+    """Ответ из записи с тем же интерфейсом, что нужен PyrusAPI от requests.Response"""
+
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+
+    def json(self):
+        return self._body
+
+class RecordingTransport:
+    """Проксирует запросы в Pyrus и дописывает пары запрос/ответ в файл"""
+
+    def __init__(self, path=TRAFFIC_FILE):
+        self.path = path
+
+    def _record(self, method, url, body, response):
+        """Дописать пару в файл; ошибка записи не должна влиять на живой запрос"""
+        try:
+            self._write(method, url, body, response)
+        except Exception as e:
+            logger.warning(f'Не удалось записать трафик {method} {url}: {e}')
+
+    def _write(self, method, url, body, response):
+        try:
+            response_body = response.json()
+        except ValueError:
+            response_body = None
+
+        entry = {
+            'method': method,
+            'url': url,
+            'body': _redact(body, REDACTED_REQUEST_KEYS),
+            'status': response.status_code,
+            'response': _redact(response_body, REDACTED_RESPONSE_KEYS),
+            'elapsed': round(response.elapsed.total_seconds(), 4)
+        }
+        # Каждая запись - отдельный gzip-член, файл читается целиком через gzip.open
+        with gzip.open(self.path, 'at', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+    def get(self, url, **kwargs):
+        response = requests.get(url, **kwargs)
+        self._record('GET', url, None, response)
+        return response
+
+    def post(self, url, json=None, **kwargs):
+        response = requests.post(url, json=json, **kwargs)
+        self._record('POST', url, json, response)
+        return response
+
+class ReplayTransport:
+    """Отдаёт записанные ответы вместо обращения к Pyrus"""
+
+    def __init__(self, path=TRAFFIC_FILE, speed=REPLAY_SPEED):
+        self.speed = speed
+        self.calls = 0
+        self.misses = 0
+        self.waited = 0.0
+        self._entries = defaultdict(list)
+        self._positions = defaultdict(int)
+
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    key = _request_key(entry['method'], entry['url'], entry['body'])
+                    self._entries[key].append(entry)
+
+    def _serve(self, method, url, body):
+        key = _request_key(method, url, _redact(body, REDACTED_REQUEST_KEYS))
+        entries = self._entries.get(key)
+        if not entries:
+            self.misses += 1
+            raise ReplayMiss(f'Нет записи для {method} {url}')
+
+        # Повторные запросы получают ответы по порядку записи, затем последний
+        position = self._positions[key]
+        entry = entries[min(position, len(entries) - 1)]
+        self._positions[key] = position + 1
+
+        if self.speed > 0:
+            delay = entry['elapsed'] / self.speed
+            time.sleep(delay)
+            self.waited += delay
+        self.calls += 1
+
+        return RecordedResponse(entry['status'], entry['response'])
+
+    def get(self, url, **kwargs):
+        return self._serve('GET', url, None)
+
+    def post(self, url, json=None, **kwargs):
+        return self._serve('POST', url, json)
+
+def get_transport():
+    """HTTP-транспорт для PyrusAPI по PYRUS_TRAFFIC_MODE"""
+    if TRAFFIC_MODE == 'record':
+        return RecordingTransport()
+    if TRAFFIC_MODE == 'replay':
+        return ReplayTransport()
+    return requests
@@ -0,0 +1,197 @@
+import os
+import time
+from datetime import datetime, timedelta
+import pandas as pd
+import pytz
+from app import db
+from app.models import DailySchedule, TaskHistory, TaskArrival
+from app.availability import END_MARGIN_MINUTES
+from app.scheduler import MAX_TASKS_PER_DAY
+
+TIMEZONE = pytz.timezone('Europe/Samara')
+WORKDAY_END_HOUR = 20
+END_MARGIN_HOURS = END_MARGIN_MINUTES / 60
+CACHE_TTL_SECONDS = int(os.environ.get('REPORT_CACHE_TTL', 60))
+
+_cache = {}
+
+def _to_local(series):
+    """Перевод naive UTC времени из БД в часовой пояс Самары"""
+    return pd.to_datetime(series).dt.tz_localize('UTC').dt.tz_convert(TIMEZONE)
+
+def _history_frame(since):
+    """Назначения за период одним запросом: только нужные колонки, без ORM-объектов"""
+    rows = db.session.query(
+        TaskHistory.employee_email,
+        TaskHistory.assigned_at,
+        TaskArrival.first_seen_at
+    ).outerjoin(
+        TaskArrival, TaskArrival.task_id == TaskHistory.task_id
+    ).filter(
+        TaskHistory.assigned_at >= since
+    ).all()
+
+    frame = pd.DataFrame([tuple(row) for row in rows], columns=['email', 'assigned_at', 'first_seen_at'])
+    frame['assigned_at'] = _to_local(frame['assigned_at'])
+    frame['first_seen_at'] = _to_local(frame['first_seen_at'])
+    return frame
+
+def _schedule_frame(first_day, last_day):
+    """Рабочие смены за период"""
+    rows = db.session.query(
+        DailySchedule.employee_email,
+        DailySchedule.date,
+        DailySchedule.start_hour,
+        DailySchedule.end_hour
+    ).filter(
+        DailySchedule.date >= first_day,
+        DailySchedule.date <= last_day,
+        DailySchedule.working_today.is_(True),
+        DailySchedule.available.is_(True)
+    ).all()
+
+    return pd.DataFrame([tuple(row) for row in rows], columns=['email', 'date', 'start_hour', 'end_hour'])
+
+def assignments_per_hour(history):
+    """Количество назначений по технологам и часам суток"""
+    counts = history.groupby(
+        [history['email'], history['assigned_at'].dt.hour.rename('hour')]
+    ).size()
+
+    result = {}
+    for (email, hour), count in counts.items():
+        result.setdefault(email, {})[f'{int(hour):02d}'] = int(count)
+    return result
+
+def assignment_latency(history):
+    """Время от появления задачи в реестре до назначения, в минутах"""
+    waits = history.assign(
+        wait=(history['assigned_at'] - history['first_seen_at']).dt.total_seconds() / 60
+    ).dropna(subset=['wait'])
+
+    def describe(series):
+        return {
+            'count': int(series.count()),
+            'mean': round(float(series.mean()), 2),
+            'median': round(float(series.median()), 2),
+            'p90': round(float(series.quantile(0.9)), 2)
+        }
+
+    if waits.empty:
+        return {'overall': None, 'by_technologist': {}}
+
+    return {
+        'overall': describe(waits['wait']),
+        'by_technologist': {
+            email: describe(group) for email, group in waits.groupby('email')['wait']
+        }
+    }
+
+def assignments_per_scheduled_hour(history, schedules):
+    """Назначений на час смены по технологам за период"""
+    if schedules.empty:
+        return {}
+
+    scheduled_hours = (schedules['end_hour'] - schedules['start_hour']).groupby(schedules['email']).sum()
+    assigned = history.groupby('email').size().reindex(scheduled_hours.index, fill_value=0)
+    rate = (assigned / scheduled_hours.where(scheduled_hours > 0)).dropna()
+    return {email: round(float(value), 2) for email, value in rate.items()}
+
+def _current_backlog(working_emails):
+    """Задачи в реестре, которые распределение назначило бы заново
+    
+    Это задачи без ответственного и задачи, ответственный которых сейчас
+    не в рабочем наборе (не на смене или уже достиг лимита задач).
+    """
+    return TaskArrival.query.filter(
+        TaskArrival.in_register.is_(True),
+        db.or_(
+            TaskArrival.responsible_email.is_(None),
+            TaskArrival.responsible_email.notin_(working_emails)
+        )
+    ).count()
+
+def _expected_arrivals(since, now):
+    """Ожидаемое число новых задач до конца рабочего дня по среднему за период"""
+    rows = db.session.query(TaskArrival.first_seen_at).filter(
+        TaskArrival.first_seen_at >= since
+    ).all()
+    seen = _to_local(pd.Series([row[0] for row in rows], dtype='datetime64[ns]'))
+    if seen.empty:
+        return 0.0
+
+    # Средний поток по часам суток среди дней, когда задачи вообще приходили
+    per_hour = seen.dt.hour.value_counts() / seen.dt.date.nunique()
+
+    current_hour = now.hour + now.minute / 60.0
+    hours = per_hour.index.to_series()
+    # Текущий час учитывается только оставшейся долей
+    remaining_share = (hours + 1 - current_hour).clip(lower=0, upper=1)
+    remaining_share[hours >= WORKDAY_END_HOUR] = 0
+    return round(float((per_hour * remaining_share).sum()), 2)
+
+def capacity_forecast(history, schedules, since, now):
+    """Сколько задач сегодняшний состав ещё может принять до конца смены"""
+    today = now.date()
+    current_hour = now.hour + now.minute / 60.0
+
+    shifts = schedules[schedules['date'] == today].set_index('email')
+    assigned_today = history[history['assigned_at'].dt.date == today].groupby('email').size()
+    assigned_today = assigned_today.reindex(shifts.index, fill_value=0)
+
+    shift_end = shifts['end_hour'] - END_MARGIN_HOURS
+    remaining_hours = (shift_end - shifts['start_hour'].clip(lower=current_hour)).clip(lower=0)
+    remaining_capacity = (MAX_TASKS_PER_DAY - assigned_today).clip(lower=0).where(remaining_hours > 0, 0)
+
+    # Рабочий набор на текущий момент - по тем же правилам, что и в TaskScheduler
+    on_shift = (shifts['start_hour'] <= current_hour) & (current_hour < shift_end)
+    working_emails = list(shifts.index[on_shift & (assigned_today < MAX_TASKS_PER_DAY)])
+    backlog = _current_backlog(working_emails)
+    expected_arrivals = _expected_arrivals(since, now)
+    capacity = int(remaining_capacity.sum())
+    demand = backlog + expected_arrivals
+
+    return {
+        'backlog': backlog,
+        'expected_arrivals': expected_arrivals,
+        'remaining_capacity': capacity,
+        'can_absorb': capacity >= demand,
+        'shortfall': round(max(0.0, demand - capacity), 2),
+        'technologists': {
+            email: {
+                'assigned_today': int(assigned_today[email]),
+                'remaining_hours': round(float(remaining_hours[email]), 2),
+                'remaining_capacity': int(remaining_capacity[email])
+            }
+            for email in shifts.index
+        }
+    }
+
+def build_load_report(days=30):
+    """Отчёт о нагрузке технологов за последние days дней"""
+    now = datetime.now(TIMEZONE)
+    first_day = now.date() - timedelta(days=days - 1)
+    since = TIMEZONE.localize(datetime.combine(first_day, datetime.min.time()))
+    since_utc = since.astimezone(pytz.utc).replace(tzinfo=None)
+
+    history = _history_frame(since_utc)
+    schedules = _schedule_frame(first_day, now.date())
+
+    return {
+        'generated_at': now.isoformat(),
+        'period_days': days,
+        'assignments_per_hour': assignments_per_hour(history),
+        'assignments_per_scheduled_hour': assignments_per_scheduled_hour(history, schedules),
+        'assignment_latency_minutes': assignment_latency(history),
+        'capacity': capacity_forecast(history, schedules, since_utc, now)
+    }
+
+def get_load_report(days=30):
+    """Отчёт о нагрузке с кэшированием на CACHE_TTL_SECONDS"""
+    cached = _cache.get(days)
+    if cached and time.monotonic() - cached[0] < CACHE_TTL_SECONDS:
+        return cached[1]
+
+    report = build_load_report(days)
+    _cache[days] = (time.monotonic(), report)
+    return report
@@ -1,10 +1,13 @@
 from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for
 from flask_login import login_user, logout_user, login_required, current_user
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 import pytz
 from app import db
 from app.models import Employee, DailySchedule, ScriptStatus, TaskHistory, User, SystemLog
 from app.scheduler import TaskScheduler
+from app.availability import upsert_schedules
+from app.reports import get_load_report
+from app import intake
 
 main = Blueprint('main', __name__)
 scheduler = TaskScheduler()
@@ -119,6 +122,68 @@ def update_schedule():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@main.route('/api/bulk_schedule', methods=['POST'])
+def bulk_schedule():
+    """Массовое обновление расписания на несколько дней и сотрудников"""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not isinstance(data.get('schedules'), list):
+            return jsonify({'success': False, 'error': 'Ожидается объект со списком schedules'}), 400
+        entries = data['schedules']
+        today = datetime.now(timezone).date()
+        
+        rows = []
+        for entry in entries:
+            if not isinstance(entry, dict):
+                return jsonify({'success': False, 'error': 'Каждая запись расписания должна быть объектом'}), 400
+            email = entry.get('email')
+            start_date = date.fromisoformat(entry['date']) if entry.get('date') else today
+            days = int(entry.get('days', 1))
+            working_today = bool(entry.get('working_today', False))
+            start_hour = int(entry.get('start_hour', 8))
+            end_hour = int(entry.get('end_hour', 17))
+            available = bool(entry.get('available', True))
+            
+            # Валидация
+            if not email:
+                return jsonify({'success': False, 'error': 'Не указан email сотрудника'}), 400
+            if not 1 <= days <= 31:
+                return jsonify({'success': False, 'error': f'Некорректное количество дней для {email}'}), 400
+            if not 0 <= start_hour <= 23:
+                return jsonify({'success': False, 'error': f'Некорректное время начала для {email}'}), 400
+            if not 0 <= end_hour <= 23:
+                return jsonify({'success': False, 'error': f'Некорректное время окончания для {email}'}), 400
+            if start_hour >= end_hour:
+                return jsonify({'success': False, 'error': f'Время окончания должно быть больше времени начала для {email}'}), 400
+            
+            for offset in range(days):
+                rows.append({
+                    'employee_email': email,
+                    'date': start_date + timedelta(days=offset),
+                    'working_today': working_today,
+                    'start_hour': start_hour,
+                    'end_hour': end_hour,
+                    'available': available
+                })
+        
+        updated = upsert_schedules(rows)
+        
+        # Логируем изменение
+        log_entry = SystemLog(
+            level='info',
+            message=f'Массовое обновление расписания: {updated} записей для {len({row["employee_email"] for row in rows})} сотрудников'
+        )
+        db.session.add(log_entry)
+        db.session.commit()
+        
+        return jsonify({'success': True, 'message': f'Обновлено записей расписания: {updated}', 'updated': updated})
+    except (ValueError, TypeError) as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @main.route('/api/control_script', methods=['POST'])
 def control_script():
     """Управление скриптом"""
@@ -208,10 +273,67 @@ def get_status():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@main.route('/api/load_report', methods=['GET'])
+def load_report():
+    """Отчёт о нагрузке технологов и прогноз ёмкости на остаток смены"""
+    try:
+        days = int(request.args.get('days', 30))
+        if not 1 <= days <= 366:
+            return jsonify({'success': False, 'error': 'Период должен быть от 1 до 366 дней'}), 400
+        
+        return jsonify({'success': True, 'report': get_load_report(days)})
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Некорректный период'}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@main.route('/api/pyrus/webhook', methods=['POST'])
+def pyrus_webhook():
+    """Приём уведомлений Pyrus об изменении задач"""
+    body = request.get_data()
+    signature = request.headers.get('X-Pyrus-Sig', '')
+    config = scheduler.pyrus_api.config
+    
+    if not intake.verify_signature(body, signature, config['WEBHOOK_SECRET']):
+        return jsonify({'success': False, 'error': 'Неверная подпись'}), 403
+    
+    try:
+        payload = request.get_json(force=True, silent=True)
+        if payload is None:
+            return jsonify({'success': False, 'error': 'Некорректный JSON'}), 400
+        
+        intake.record_payload(payload)
+        
+        task_id = intake.extract_task_id(payload, config['FORM_ID'], config['STEP'])
+        if task_id is not None:
+            intake.enqueue(task_id, payload.get('event'))
+        
+        return jsonify({})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @main.route('/api/run_distribution', methods=['POST'])
 def run_distribution():
     """Ручной запуск распределения задач"""
     try:
+        data = request.get_json(silent=True) or {}
+        if data.get('dry_run'):
+            # Пробный прогон: назначения вычисляются, но не записываются
+            dry_scheduler = TaskScheduler(dry_run=True)
+            assigned = dry_scheduler.distribute_tasks()
+            return jsonify({
+                'success': True,
+                'message': f'Пробное распределение. Было бы назначено задач: {assigned}',
+                'tasks_assigned': assigned,
+                'assignments': [
+                    {'task_id': task_id, 'email': email}
+                    for task_id, email in dry_scheduler.last_assignments
+                ]
+            })
+        
         assigned = scheduler.distribute_tasks()
         return jsonify({
             'success': True,
@@ -3,72 +3,145 @@ import pytz
 from datetime import datetime, timedelta
 from sqlalchemy import func
 from app import db
-from app.models import DailySchedule, ScriptStatus, TaskHistory, Employee, SystemLog
+from app.models import DailySchedule, ScriptStatus, TaskHistory, TaskArrival, Employee, SystemLog
 from app.pyrus_api import PyrusAPI
+from app.pyrus_traffic import ReplayMiss
+from app.availability import AvailabilityTimeline
+from app.working_set import Technologist, WorkingSet
 
 logger = logging.getLogger(__name__)
 
+MAX_TASKS_PER_DAY = 20  # Максимум задач на технолога в день
+
 class TaskScheduler:
-    def __init__(self):
-        self.pyrus_api = PyrusAPI()
+    def __init__(self, pyrus_api=None, dry_run=False, fixed_time=None):
+        self.dry_run = dry_run
+        self.pyrus_api = pyrus_api or PyrusAPI(dry_run=dry_run)
         self.timezone = pytz.timezone('Europe/Samara')
+        # Момент, на который считается распределение (для воспроизведения записей)
+        self.fixed_time = fixed_time
+        self.last_assignments = []
+        self.last_handled = []
+        self._timeline = None
     
     def _log(self, level, message):
         """Логирование в базу данных"""
-        log_entry = SystemLog(level=level, message=message)
-        db.session.add(log_entry)
-        db.session.commit()
+        if not self.dry_run:
+            log_entry = SystemLog(level=level, message=message)
+            db.session.add(log_entry)
+            db.session.commit()
         getattr(logger, level)(message)
     
-    def is_within_work_hours(self, current_hour, start_hour, end_hour):
-        """Проверка, находится ли текущее время в рабочих часах"""
-        # Вычитаем 10 минут (0.17 часа) до окончания работы
-        return start_hour <= current_hour < (end_hour - 0.17)
+    def current_time(self):
+        """Текущее время в часовом поясе Самары"""
+        return self.fixed_time or datetime.now(self.timezone)
     
-    def get_working_technologists(self):
-        """Получить список работающих технологов на текущий момент"""
-        current_time = datetime.now(self.timezone)
-        current_hour = current_time.hour + current_time.minute / 60.0
+    def get_availability_timeline(self, day, schedules):
+        """Сетка доступности на день; пересобирается только при изменении расписания"""
+        if (self._timeline is None or self._timeline.day != day
+                or not self._timeline.matches(schedules)):
+            self._timeline = AvailabilityTimeline(day, schedules)
+        
+        return self._timeline
+    
+    def build_working_set(self):
+        """Собрать рабочий набор технологов одним запросом"""
+        current_time = self.current_time()
         today = current_time.date()
         
-        # Получаем расписание на сегодня
-        schedules = DailySchedule.query.filter_by(
-            date=today,
-            working_today=True,
-            available=True
+        # Расписание на сегодня вместе с именами и количеством задач за день
+        rows = db.session.query(
+            DailySchedule.employee_email,
+            DailySchedule.working_today,
+            DailySchedule.start_hour,
+            DailySchedule.end_hour,
+            DailySchedule.available,
+            Employee.name,
+            func.count(TaskHistory.id).label('task_count')
+        ).outerjoin(
+            Employee, Employee.email == DailySchedule.employee_email
+        ).outerjoin(
+            TaskHistory, db.and_(
+                TaskHistory.employee_email == DailySchedule.employee_email,
+                func.date(TaskHistory.assigned_at) == today
+            )
+        ).filter(
+            DailySchedule.date == today
+        ).group_by(
+            DailySchedule.employee_email,
+            DailySchedule.working_today,
+            DailySchedule.start_hour,
+            DailySchedule.end_hour,
+            DailySchedule.available,
+            Employee.name
         ).all()
         
-        working_techs = []
-        for schedule in schedules:
-            if self.is_within_work_hours(current_hour, schedule.start_hour, schedule.end_hour):
-                # Получаем количество задач сегодня
-                task_count = TaskHistory.query.filter_by(
-                    employee_email=schedule.employee_email
-                ).filter(
-                    func.date(TaskHistory.assigned_at) == today
-                ).count()
-                
-                if task_count < 20:  # Максимум 20 задач в день
-                    working_techs.append({
-                        'email': schedule.employee_email,
-                        'name': Employee.query.filter_by(email=schedule.employee_email).first().name,
-                        'task_count': task_count,
-                        'start_hour': schedule.start_hour,
-                        'end_hour': schedule.end_hour
-                    })
+        # Кто работает сейчас - готовый ответ из поминутной сетки
+        timeline = self.get_availability_timeline(today, rows)
+        by_email = {row.employee_email: row for row in rows}
+        
+        technologists = []
+        for order, email in enumerate(timeline.working_at(current_time)):
+            row = by_email[email]
+            if row.task_count < MAX_TASKS_PER_DAY:
+                technologists.append(Technologist(
+                    email=email,
+                    name=row.name or email,
+                    task_count=row.task_count,
+                    start_hour=row.start_hour,
+                    end_hour=row.end_hour,
+                    order=order
+                ))
         
-        return working_techs
+        return WorkingSet(technologists)
+    
+    def get_working_technologists(self):
+        """Получить список работающих технологов на текущий момент"""
+        # Набор строится заново одним запросом, чтобы статус сразу отражал изменения расписания
+        return self.build_working_set().to_list()
     
-    def distribute_tasks(self):
-        """Основная функция распределения задач"""
+    def record_arrivals(self, task_ids):
+        """Сохранить снимок реестра: новые задачи, время появления и выбывшие задачи"""
+        now = datetime.utcnow()
+        known = {
+            row.task_id for row in db.session.query(TaskArrival.task_id)
+            .filter(TaskArrival.task_id.in_(task_ids))
+        }
+        
+        # Задачи, которых нет в снимке, больше не ждут распределения
+        TaskArrival.query.filter(
+            TaskArrival.in_register.is_(True),
+            TaskArrival.task_id.notin_(task_ids)
+        ).update({'in_register': False}, synchronize_session=False)
+        
+        if known:
+            TaskArrival.query.filter(TaskArrival.task_id.in_(known)).update(
+                {'last_seen_at': now, 'in_register': True}, synchronize_session=False
+            )
+        db.session.add_all(
+            TaskArrival(task_id=task_id, first_seen_at=now, last_seen_at=now, in_register=True)
+            for task_id in set(task_ids) - known
+        )
+        db.session.commit()
+    
+    def distribute_tasks(self, task_ids=None):
+        """Основная функция распределения задач
+        
+        Без task_ids задачи берутся из реестра Pyrus (сверка),
+        иначе распределяются только переданные задачи из очереди webhook.
+        В режиме dry_run назначения только вычисляются и попадают в last_assignments.
+        В last_handled попадают задачи, по которым больше ничего делать не нужно.
+        """
+        self.last_assignments = []
+        self.last_handled = []
         try:
-            # Проверяем статус скрипта
+            # Проверяем статус скрипта (пробный прогон возможен и при остановленном)
             status = ScriptStatus.query.get(1)
-            if not status or not status.is_running:
+            if not self.dry_run and (not status or not status.is_running):
                 self._log('info', 'Скрипт остановлен, пропускаем распределение')
                 return 0
             
-            current_time = datetime.now(self.timezone)
+            current_time = self.current_time()
             current_hour = current_time.hour + current_time.minute / 60.0
             
             # Проверяем рабочее время (8:30 - 20:00)
@@ -76,62 +149,80 @@ class TaskScheduler:
                 self._log('info', f'Вне рабочего времени: {current_hour:.2f}')
                 return 0
             
+            # Получаем задачи из Pyrus; снимок реестра сохраняем всегда,
+            # даже пустой и даже когда некому распределять
+            if task_ids is None:
+                tasks = self.pyrus_api.fetch_tasks()
+                if tasks is not None and not self.dry_run:
+                    self.record_arrivals(tasks)
+            else:
+                tasks = task_ids
+            
             # Получаем работающих технологов
-            working_techs = self.get_working_technologists()
+            working_set = self.build_working_set()
             
-            if not working_techs:
+            if not working_set:
                 self._log('warning', 'Нет доступных технологов для распределения')
                 return 0
             
-            # Получаем задачи из Pyrus
-            tasks = self.pyrus_api.fetch_tasks()
-            
             if not tasks:
                 self._log('info', 'Нет задач для распределения')
                 return 0
             
-            # Сортируем технологов по количеству задач (Round Robin)
-            working_techs.sort(key=lambda x: x['task_count'])
-            
             # Распределяем задачи
             tasks_assigned = 0
             today = current_time.date()
             
+            # Текущий ответственный по задаче нужен отчёту о нагрузке для оценки очереди
+            arrivals = {} if self.dry_run else {
+                arrival.task_id: arrival
+                for arrival in TaskArrival.query.filter(TaskArrival.task_id.in_(tasks))
+            }
+            
             for task_id in tasks:
                 # Проверяем, есть ли уже ответственный
                 current_responsible = self.pyrus_api.get_task_responsible(task_id)
+                if task_id in arrivals:
+                    arrivals[task_id].responsible_email = current_responsible
                 
                 if current_responsible:
                     # Если задача уже назначена на работающего технолога, пропускаем
-                    if any(tech['email'] == current_responsible for tech in working_techs):
+                    if current_responsible in working_set:
                         self._log('info', f'Задача {task_id} уже назначена на {current_responsible}')
+                        self.last_handled.append(task_id)
                         continue
                 
                 # Выбираем технолога с наименьшим количеством задач
-                selected_tech = working_techs[0]
+                selected_tech = working_set.least_loaded()
                 
                 # Назначаем задачу
-                if self.pyrus_api.change_responsible(task_id, selected_tech['email']):
+                if self.pyrus_api.change_responsible(task_id, selected_tech.email):
                     # Сохраняем в историю
-                    task_history = TaskHistory(
-                        task_id=task_id,
-                        employee_email=selected_tech['email']
-                    )
-                    db.session.add(task_history)
+                    if not self.dry_run:
+                        task_history = TaskHistory(
+                            task_id=task_id,
+                            employee_email=selected_tech.email
+                        )
+                        db.session.add(task_history)
+                    if task_id in arrivals:
+                        arrivals[task_id].responsible_email = selected_tech.email
+                    self.last_assignments.append((task_id, selected_tech.email))
+                    self.last_handled.append(task_id)
                     
-                    # Обновляем счетчик задач
-                    selected_tech['task_count'] += 1
+                    # Обновляем счетчик задач (Round Robin)
+                    working_set.record_assignment(selected_tech)
                     tasks_assigned += 1
                     
-                    # Пересортировка для Round Robin
-                    working_techs.sort(key=lambda x: x['task_count'])
-                    
-                    self._log('info', f'Задача {task_id} назначена на {selected_tech["email"]}')
+                    self._log('info', f'Задача {task_id} назначена на {selected_tech.email}')
             
-            db.session.commit()
+            if not self.dry_run:
+                db.session.commit()
             self._log('info', f'Распределение завершено. Назначено задач: {tasks_assigned}')
             return tasks_assigned
             
+        except ReplayMiss:
+            db.session.rollback()
+            raise
         except Exception as e:
             self._log('error', f'Критическая ошибка при распределении: {str(e)}')
             db.session.rollback()
@@ -141,7 +232,7 @@ class TaskScheduler:
         """Проверка состояния системы"""
         status = ScriptStatus.query.get(1)
         working_techs = self.get_working_technologists()
-        current_time = datetime.now(self.timezone)
+        current_time = self.current_time()
         
         system_status = {
             'timestamp': current_time.isoformat(),
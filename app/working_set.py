@@ -0,0 +1,62 @@
+import heapq
+
+class Technologist:
+    """Работающий технолог в рамках одного цикла распределения"""
+    __slots__ = ('email', 'name', 'task_count', 'start_hour', 'end_hour', 'order')
+
+    def __init__(self, email, name, task_count, start_hour, end_hour, order=0):
+        self.email = email
+        self.name = name
+        self.task_count = task_count
+        self.start_hour = start_hour
+        self.end_hour = end_hour
+        self.order = order
+
+    def to_dict(self):
+        return {
+            'email': self.email,
+            'name': self.name,
+            'task_count': self.task_count,
+            'start_hour': self.start_hour,
+            'end_hour': self.end_hour
+        }
+
+    def __repr__(self):
+        return f'<Technologist {self.email} tasks={self.task_count}>'
+
+class WorkingSet:
+    """Работающие технологи: индекс по email и очередь по нагрузке (Round Robin)"""
+
+    def __init__(self, technologists):
+        self.technologists = list(technologists)
+        self.by_email = {tech.email: tech for tech in self.technologists}
+        # Куча (количество задач, порядок, технолог): выбор наименее загруженного за O(log n)
+        self._heap = [(tech.task_count, tech.order, tech) for tech in self.technologists]
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self.technologists)
+
+    def __iter__(self):
+        return iter(self.technologists)
+
+    def __contains__(self, email):
+        return email in self.by_email
+
+    def least_loaded(self):
+        """Технолог с наименьшим количеством задач"""
+        return self._heap[0][2]
+
+    def record_assignment(self, tech):
+        """Учесть назначенную технологу задачу"""
+        tech.task_count += 1
+        if self._heap and self._heap[0][2] is tech:
+            heapq.heapreplace(self._heap, (tech.task_count, tech.order, tech))
+        else:
+            # Назначение не наименее загруженному - пересобираем кучу целиком
+            self._heap = [(t.task_count, t.order, t) for t in self.technologists]
+            heapq.heapify(self._heap)
+
+    def to_list(self):
+        """Список словарей для JSON, отсортированный по нагрузке"""
+        return [tech.to_dict() for tech in sorted(self.technologists, key=lambda t: (t.task_count, t.order))]
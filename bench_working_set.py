@@ -0,0 +1,43 @@
+import argparse
+import os
+import sys
+import time
+
+# Настройка путей
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.working_set import Technologist, WorkingSet
+
+def run(techs, tasks, repeats):
+    """Накладные расходы рабочего набора на одну задачу цикла распределения"""
+    emails = [f'tech{i}@hoff.ru' for i in range(techs)]
+    # Половина задач уже у кого-то из работающих, половина - у неработающих
+    responsibles = [emails[i % techs] if i % 2 else f'other{i}@hoff.ru' for i in range(tasks)]
+    
+    best = None
+    for _ in range(repeats):
+        working_set = WorkingSet(
+            Technologist(email, email, 0, 8, 17, order) for order, email in enumerate(emails)
+        )
+        
+        started = time.perf_counter()
+        for responsible in responsibles:
+            if responsible in working_set:
+                continue
+            working_set.record_assignment(working_set.least_loaded())
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    
+    print(f"Технологов: {techs}, задач: {tasks}, лучший из {repeats}: {best:.4f} с, "
+          f"{best / tasks * 1e6:.2f} мкс на задачу")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Бенчмарк рабочего набора технологов')
+    parser.add_argument('--techs', type=int, nargs='+', default=[4, 50, 500])
+    parser.add_argument('--tasks', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+    
+    for techs in args.techs:
+        for tasks in args.tasks:
+            run(techs, tasks, args.repeats)
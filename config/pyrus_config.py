@@ -10,7 +10,8 @@ try:
         'LOGIN': login,
         'SECURITY_KEY': security_key,
         'ACCESS_TOKEN': access_token,
-        'AUTH_URL': 'https://api.pyrus.com/v4/auth'
+        'AUTH_URL': 'https://api.pyrus.com/v4/auth',
+        'WEBHOOK_SECRET': os.environ.get('PYRUS_WEBHOOK_SECRET', security_key)
     }
 except ImportError:
     # Если файла нет, используем переменные окружения
@@ -18,9 +19,14 @@ except ImportError:
         'LOGIN': os.environ.get('PYRUS_LOGIN', ''),
         'SECURITY_KEY': os.environ.get('PYRUS_SECURITY_KEY', ''),
         'ACCESS_TOKEN': os.environ.get('PYRUS_ACCESS_TOKEN', ''),
-        'AUTH_URL': 'https://api.pyrus.com/v4/auth'
+        'AUTH_URL': 'https://api.pyrus.com/v4/auth',
+        'WEBHOOK_SECRET': os.environ.get('PYRUS_WEBHOOK_SECRET', os.environ.get('PYRUS_SECURITY_KEY', ''))
     }
 
+# Форма и этап реестра, с которых распределяются задачи
+PYRUS_CONFIG['FORM_ID'] = 607869
+PYRUS_CONFIG['STEP'] = 4
+
 # Валидация конфигурации
 if not all([PYRUS_CONFIG['LOGIN'], PYRUS_CONFIG['SECURITY_KEY']]):
     print("ВНИМАНИЕ: Конфигурация Pyrus не настроена!")
@@ -4,3 +4,14 @@ workers = 2
 threads = 2
 timeout = 120
 keepalive = 5
+# Приложение (create_all, начальные данные) создаётся один раз в мастер-процессе
+preload_app = True
+
+def post_fork(server, worker):
+    """Сброс пула соединений, унаследованного от мастер-процесса"""
+    # Приложение и пул создаются до fork, и дочерние процессы не должны
+    # использовать сокеты Postgres, открытые родителем
+    from app import db
+    from wsgi import app
+    with app.app_context():
+        db.engine.dispose(close=False)
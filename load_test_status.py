@@ -0,0 +1,72 @@
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Настройка путей
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app, db, get_engine_options
+
+def run(clients, requests_per_client):
+    """Параллельные опросы /api/get_status с замером использования пула соединений"""
+    app = create_app()
+    
+    options = get_engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+    if 'pool_size' not in options:
+        print("Нужна база с пулом соединений: Postgres или файловая SQLite в DATABASE_URL")
+        return False
+    limit = options['pool_size'] + options['max_overflow']
+    
+    with app.app_context():
+        pool = db.engine.pool
+    
+    peak = {'checked_out': 0, 'overflow': pool.overflow()}
+    stop = threading.Event()
+    
+    def monitor():
+        while not stop.is_set():
+            peak['checked_out'] = max(peak['checked_out'], pool.checkedout())
+            peak['overflow'] = max(peak['overflow'], pool.overflow())
+            time.sleep(0.001)
+    
+    def poll():
+        client = app.test_client()
+        statuses = []
+        for _ in range(requests_per_client):
+            statuses.append(client.get('/api/get_status').status_code)
+        return statuses
+    
+    watcher = threading.Thread(target=monitor, daemon=True)
+    watcher.start()
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        results = [status for statuses in executor.map(lambda _: poll(), range(clients)) for status in statuses]
+    elapsed = time.perf_counter() - started
+    
+    stop.set()
+    watcher.join()
+    
+    errors = sum(1 for status in results if status != 200)
+    print(f"Пул: {pool.status()}")
+    print(f"Запросов: {len(results)}, ошибок: {errors}, время: {elapsed:.2f} с")
+    print(f"Максимум занятых соединений: {peak['checked_out']}, максимум overflow: {peak['overflow']}")
+    print(f"Сейчас занято соединений: {pool.checkedout()}")
+    
+    if peak['checked_out'] > limit:
+        print(f"ОШИБКА: занято больше соединений, чем pool_size + max_overflow = {limit}")
+        return False
+    print(f"OK: соединений не больше pool_size + max_overflow = {limit}")
+    return True
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Нагрузочный тест опроса статуса дашборда')
+    parser.add_argument('--clients', type=int, default=20, help='Одновременных клиентов')
+    parser.add_argument('--requests', type=int, default=10, help='Запросов на клиента')
+    args = parser.parse_args()
+    
+    if not run(args.clients, args.requests):
+        sys.exit(1)
@@ -0,0 +1,62 @@
+import argparse
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+import pytz
+
+# Настройка путей
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from app.pyrus_api import PyrusAPI
+from app.pyrus_traffic import ReplayTransport, ReplayMiss
+from app.scheduler import TaskScheduler
+
+def run(path, speed, at):
+    """Пробное распределение на записанном трафике Pyrus без изменений в Pyrus и БД"""
+    app = create_app()
+    
+    with app.app_context():
+        transport = ReplayTransport(path, speed=speed)
+        scheduler = TaskScheduler(
+            pyrus_api=PyrusAPI(transport=transport, dry_run=True),
+            dry_run=True,
+            fixed_time=at
+        )
+        
+        started = time.perf_counter()
+        try:
+            assigned = scheduler.distribute_tasks()
+        except ReplayMiss as e:
+            # Без ответа из записи результат распределения недостоверен
+            print(f"Ошибка воспроизведения: {e}")
+            print(f"Запросов к Pyrus: {transport.calls}, без записи: {transport.misses}")
+            return False
+        elapsed = time.perf_counter() - started
+        
+        print(f"Было бы назначено задач: {assigned}")
+        for email, count in Counter(email for _, email in scheduler.last_assignments).most_common():
+            print(f"  {email}: {count}")
+        print(f"Запросов к Pyrus: {transport.calls}, без записи: {transport.misses}, "
+              f"ожидание ответов: {transport.waited:.2f} с")
+        print(f"Время распределения: {elapsed:.3f} с, вычисления: {elapsed - transport.waited:.3f} с")
+        return True
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Распределение задач на записанном трафике Pyrus (dry-run)')
+    parser.add_argument('path', help='Файл, записанный с PYRUS_TRAFFIC_MODE=record')
+    parser.add_argument('--speed', type=float, default=1,
+                        help='Масштаб задержек: 1 - как в записи, 0 - без задержек')
+    parser.add_argument('--at', help='Момент распределения "YYYY-MM-DD HH:MM" по Самаре (по умолчанию сейчас)')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING)
+    
+    timezone = pytz.timezone('Europe/Samara')
+    at = timezone.localize(datetime.strptime(args.at, '%Y-%m-%d %H:%M')) if args.at else None
+    if not run(args.path, args.speed, at):
+        sys.exit(1)
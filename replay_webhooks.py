@@ -0,0 +1,46 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import requests
+
+# Настройка путей
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.intake import sign_payload
+from config.pyrus_config import PYRUS_CONFIG
+
+def replay(path, url, secret, delay):
+    """Отправить записанные уведомления Pyrus на локальный webhook"""
+    with open(path, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    
+    for record in records:
+        body = record['body'].encode('utf-8')
+        # access_token в записи заменён, а локальный секрет отличается от боевого,
+        # поэтому тело всегда подписывается заново
+        signature = sign_payload(body, secret)
+        
+        response = requests.post(
+            url,
+            data=body,
+            headers={'Content-Type': 'application/json', 'X-Pyrus-Sig': signature},
+            timeout=30
+        )
+        print(f"{record.get('received_at', '-')}: {response.status_code} {response.text.strip()}")
+        
+        if delay:
+            time.sleep(delay)
+    
+    print(f"Отправлено уведомлений: {len(records)}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Воспроизведение записанных webhook Pyrus')
+    parser.add_argument('path', help='JSONL-файл, записанный через WEBHOOK_RECORD_PATH')
+    parser.add_argument('--url', default='http://localhost:10000/api/pyrus/webhook')
+    parser.add_argument('--delay', type=float, default=0, help='Пауза между запросами, сек')
+    args = parser.parse_args()
+    
+    replay(args.path, args.url, PYRUS_CONFIG['WEBHOOK_SECRET'], args.delay)
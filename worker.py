@@ -10,6 +10,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app import create_app, db
 from app.scheduler import TaskScheduler
+from app import intake
 
 # Настройка логирования
 logging.basicConfig(
@@ -22,6 +23,10 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Очередь webhook проверяется часто, полный опрос реестра - редкая сверка
+INTAKE_POLL_SECONDS = int(os.environ.get('INTAKE_POLL_SECONDS', 5))
+RECONCILE_INTERVAL_SECONDS = int(os.environ.get('RECONCILE_INTERVAL_SECONDS', 600))
+
 def worker_loop():
     """Основной цикл воркера"""
     app = create_app()
@@ -31,6 +36,8 @@ def worker_loop():
         
         logger.info("Воркер запущен и готов к работе")
         
+        last_reconcile = None
+        
         while True:
             try:
                 current_time = datetime.now(pytz.timezone('Europe/Samara'))
@@ -38,24 +45,37 @@ def worker_loop():
                 
                 # Проверяем, нужно ли запускать распределение
                 if 8.5 <= current_hour < 20:
-                    logger.info(f"[{current_time.strftime('%H:%M:%S')}] Запуск распределения задач...")
-                    
-                    # Запускаем распределение
-                    tasks_assigned = scheduler.distribute_tasks()
+                    # Задачи из webhook распределяем сразу; из очереди удаляются
+                    # только обработанные, остальные будут повторены
+                    task_ids = intake.pending()
+                    if task_ids:
+                        logger.info(f"[{current_time.strftime('%H:%M:%S')}] Задач из webhook: {len(task_ids)}")
+                        tasks_assigned = scheduler.distribute_tasks(task_ids)
+                        intake.acknowledge(scheduler.last_handled)
+                        
+                        if tasks_assigned > 0:
+                            logger.info(f"Назначено задач: {tasks_assigned}")
                     
-                    if tasks_assigned > 0:
-                        logger.info(f"Назначено задач: {tasks_assigned}")
+                    if last_reconcile is None or time.monotonic() - last_reconcile >= RECONCILE_INTERVAL_SECONDS:
+                        logger.info(f"[{current_time.strftime('%H:%M:%S')}] Сверка с реестром Pyrus...")
+                        last_reconcile = time.monotonic()
+                        
+                        tasks_assigned = scheduler.distribute_tasks()
+                        intake.acknowledge(scheduler.last_handled)
+                        
+                        if tasks_assigned > 0:
+                            logger.info(f"Назначено задач: {tasks_assigned}")
                 else:
                     logger.debug(f"[{current_time.strftime('%H:%M:%S')}] Вне рабочего времени ({current_hour:.2f})")
                 
-                # Ждем 60 секунд
-                time.sleep(60)
+                time.sleep(INTAKE_POLL_SECONDS)
                 
             except KeyboardInterrupt:
                 logger.info("Воркер остановлен по запросу пользователя")
                 break
             except Exception as e:
                 logger.error(f"Ошибка в воркере: {e}")
+                db.session.rollback()
                 time.sleep(60)  # Ждем перед повторной попыткой
 
 if __name__ == '__main__':